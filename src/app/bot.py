@@ -1,8 +1,10 @@
 import os
 import logging
+import uuid
 import aiohttp
 from aiogram import Bot, Dispatcher, types
 from aiogram.enums import ParseMode
+from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.filters import CommandStart
 from aiogram.types import Message
@@ -20,19 +22,30 @@ bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTM
 dp = Dispatcher(storage=MemoryStorage())
 
 @dp.message(CommandStart())
-async def start(message: Message):
+async def start(message: Message, state: FSMContext):
+    await state.clear()
     await message.answer("👋 Привет! Отправь юридический вопрос, и я постараюсь ответить согласно закону.")
 
 @dp.message(F.text)
-async def handle_question(message: Message):
+async def handle_question(message: Message, state: FSMContext):
     user_question = message.text.strip()
 
+    state_data = await state.get_data()
+    session_id = state_data.get("session_id")
+    if session_id is None:
+        session_id = f"{message.chat.id}:{uuid.uuid4().hex}"
+        await state.update_data(session_id=session_id)
+
     async with aiohttp.ClientSession() as session:
         try:
-            async with session.post(f"{FASTAPI_HOST}/get_question", json={"question": user_question}) as resp:
+            payload = {"question": user_question, "session_id": session_id}
+            async with session.post(f"{FASTAPI_HOST}/get_question", json=payload) as resp:
                 if resp.status == 200:
                     data = await resp.json()
-                    await message.reply(f"⚖️ <b>Ответ:</b>\n{data['answer']}")
+                    answer = f"⚖️ <b>Ответ:</b>\n{data['answer']}"
+                    if data.get("sources"):
+                        answer += f"\n\n📚 <b>Источники:</b> {', '.join(data['sources'])}"
+                    await message.reply(answer)
                 else:
                     await message.reply("⚠️ Не удалось получить ответ. Попробуй позже.")
         except Exception as e:
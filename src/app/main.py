@@ -2,9 +2,10 @@ import uvicorn
 
 from fastapi import FastAPI
 from pydantic import BaseModel
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from src.rag_main.rag_inference import get_rag_answer, RAGConfig
+from src.rag_main.rag_session import SessionStore
 
 
 
@@ -16,19 +17,23 @@ app = FastAPI(
 
 
 config = RAGConfig()
+sessions = SessionStore()
 
 class QuestionRequest(BaseModel):
     question: str
+    session_id: Optional[str] = None
 
 class AnswerResponse(BaseModel):
     answer: str
+    sources: List[str] = []
 
 
 
 @app.post("/get_question", response_model=AnswerResponse, summary="Задать юридический вопрос", tags=["RAG QA"])
-async def get_question(request: QuestionRequest) -> Dict[str, str]:
-    answer = get_rag_answer(request.question, config)
-    return {"answer": answer}
+async def get_question(request: QuestionRequest) -> Dict[str, Any]:
+    session = sessions.get(request.session_id) if request.session_id else None
+    result = get_rag_answer(request.question, config, session)
+    return {"answer": result.answer, "sources": result.sources}
 
 @app.get("/health", tags=["System"])
 async def health_check():
@@ -0,0 +1,337 @@
+import json
+import logging
+import os
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+BLOCK_SIZE = 4096
+
+CHUNKS_FILE = "chunks.json"
+CODES_FILE = "codes.npy"
+FULL_VECTORS_FILE = "vectors_f32.npy"
+META_FILE = "store.json"
+
+
+class ChunkStore:
+    """Чанки в одном текстовом буфере с массивами метаданных вместо списка Document."""
+
+    __slots__ = ("_text", "_offsets", "_pages", "_source_ids", "_sources", "_article_ids", "_articles")
+
+    def __init__(
+        self,
+        text: str = "",
+        offsets: Optional[Sequence[int]] = None,
+        pages: Optional[Sequence[int]] = None,
+        source_ids: Optional[Sequence[int]] = None,
+        sources: Optional[List[str]] = None,
+        article_ids: Optional[Sequence[int]] = None,
+        articles: Optional[List[str]] = None,
+    ):
+        self._text = text
+        self._offsets = array("q", offsets if offsets is not None else [0])
+        self._pages = array("i", pages if pages is not None else [])
+        self._source_ids = array("i", source_ids if source_ids is not None else [])
+        self._sources = sources if sources is not None else []
+        self._article_ids = array("i", article_ids if article_ids is not None else [-1] * len(self._pages))
+        self._articles = articles if articles is not None else []
+
+    @classmethod
+    def from_documents(cls, docs: Sequence[Document]) -> "ChunkStore":
+        parts: List[str] = []
+        offsets = [0]
+        pages: List[int] = []
+        source_ids: List[int] = []
+        sources: List[str] = []
+        source_index: Dict[str, int] = {}
+        article_ids: List[int] = []
+        articles: List[str] = []
+        article_index: Dict[str, int] = {}
+
+        for doc in docs:
+            parts.append(doc.page_content)
+            offsets.append(offsets[-1] + len(doc.page_content))
+            pages.append(int(doc.metadata.get("page", -1)))
+            source = str(doc.metadata.get("source", ""))
+            if source not in source_index:
+                source_index[source] = len(sources)
+                sources.append(source)
+            source_ids.append(source_index[source])
+            article = doc.metadata.get("article")
+            if article is None:
+                article_ids.append(-1)
+                continue
+            if article not in article_index:
+                article_index[article] = len(articles)
+                articles.append(article)
+            article_ids.append(article_index[article])
+
+        return cls("".join(parts), offsets, pages, source_ids, sources, article_ids, articles)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def text(self, i: int) -> str:
+        return self._text[self._offsets[i]:self._offsets[i + 1]]
+
+    def document(self, i: int) -> Document:
+        metadata: Dict[str, Any] = {"source": self._sources[self._source_ids[i]]}
+        if self._pages[i] >= 0:
+            metadata["page"] = self._pages[i]
+        if self._article_ids[i] >= 0:
+            metadata["article"] = self._articles[self._article_ids[i]]
+        return Document(page_content=self.text(i), metadata=metadata)
+
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self._text)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._pages.itemsize * len(self._pages)
+            + self._source_ids.itemsize * len(self._source_ids)
+            + self._article_ids.itemsize * len(self._article_ids)
+            + sum(sys.getsizeof(value) for value in self._sources + self._articles)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self._text,
+            "offsets": self._offsets.tolist(),
+            "pages": self._pages.tolist(),
+            "source_ids": self._source_ids.tolist(),
+            "sources": self._sources,
+            "article_ids": self._article_ids.tolist(),
+            "articles": self._articles,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChunkStore":
+        return cls(
+            data["text"],
+            data["offsets"],
+            data["pages"],
+            data["source_ids"],
+            data["sources"],
+            data.get("article_ids"),
+            data.get("articles"),
+        )
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """Возвращает (codes, scale, offset); scale и offset заданы только для int8."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None, None
+    if dtype == "int8":
+        if len(vectors) == 0:
+            dim = vectors.shape[1]
+            return vectors.astype(np.int8), np.ones(dim, dtype=np.float32), np.zeros(dim, dtype=np.float32)
+        low = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - low) / 255.0
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.round((vectors - low) / scale) - 128, -128, 127).astype(np.int8)
+        return codes, scale.astype(np.float32), low.astype(np.float32)
+    raise ValueError(f"Неподдерживаемый тип векторов: {dtype}. Допустимые: {', '.join(VECTOR_DTYPES)}")
+
+
+def _l2_distances(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    diff = vectors - query
+    return np.einsum("ij,ij->i", diff, diff)
+
+
+class QuantizedVectors:
+    """Грубый поиск по сжатым векторам и точный пересчёт кандидатов по float32."""
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        full_vectors: np.ndarray,
+        dtype: str,
+        scale: Optional[np.ndarray] = None,
+        offset: Optional[np.ndarray] = None,
+        rescore_factor: int = 4,
+    ):
+        self.codes = codes
+        self.full_vectors = full_vectors
+        self.dtype = dtype
+        self.scale = scale
+        self.offset = offset
+        self.rescore_factor = max(1, rescore_factor)
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, dtype: str, rescore_factor: int = 4) -> "QuantizedVectors":
+        full_vectors = np.asarray(vectors, dtype=np.float32)
+        codes, scale, offset = quantize(full_vectors, dtype)
+        return cls(codes, full_vectors, dtype, scale, offset, rescore_factor)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _decode(self, start: int, stop: int) -> np.ndarray:
+        block = self.codes[start:stop].astype(np.float32)
+        if self.dtype == "int8":
+            block = (block + 128.0) * self.scale + self.offset
+        return block
+
+    def coarse_distances(self, query: np.ndarray) -> np.ndarray:
+        distances = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, len(self.codes))
+            distances[start:stop] = _l2_distances(query, self._decode(start, stop))
+        return distances
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(self.codes)
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32)
+        k = min(k, n)
+        n_candidates = min(n, k * self.rescore_factor)
+
+        coarse = self.coarse_distances(query)
+        if n_candidates < n:
+            candidates = np.sort(np.argpartition(coarse, n_candidates - 1)[:n_candidates])
+        else:
+            candidates = np.arange(n)
+
+        exact = _l2_distances(query, np.asarray(self.full_vectors[candidates], dtype=np.float32))
+        order = np.argsort(exact, kind="stable")[:k]
+        return candidates[order], exact[order]
+
+    def nbytes(self) -> int:
+        extra = sum(a.nbytes for a in (self.scale, self.offset) if a is not None)
+        return int(self.codes.nbytes + extra)
+
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    distances = _l2_distances(np.asarray(query, dtype=np.float32), vectors)
+    k = min(k, len(vectors))
+    top = np.argpartition(distances, k - 1)[:k]
+    return top[np.argsort(distances[top], kind="stable")]
+
+
+def evaluate_recall(
+    vectors: np.ndarray,
+    dtype: str,
+    k: int = 10,
+    rescore_factor: int = 4,
+    sample_size: int = 200,
+    seed: int = 0,
+) -> float:
+    """Recall@k сжатого поиска относительно точного float32.
+
+    Запросами служат отложенные векторы, которые не попадают в индекс, иначе каждый
+    запрос находил бы сам себя на нулевом расстоянии и recall был бы завышен.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) < 2:
+        return 1.0
+
+    rng = np.random.default_rng(seed)
+    held_out = np.zeros(len(vectors), dtype=bool)
+    held_out[rng.choice(len(vectors), size=min(sample_size, len(vectors) // 2), replace=False)] = True
+    queries = vectors[held_out]
+    indexed = vectors[~held_out]
+
+    index = QuantizedVectors.from_vectors(indexed, dtype, rescore_factor)
+
+    hits = 0
+    total = 0
+    for query in queries:
+        expected = set(exact_search(indexed, query, k).tolist())
+        found, _ = index.search(query, k)
+        hits += len(expected.intersection(found.tolist()))
+        total += len(expected)
+    return hits / total
+
+
+def compare_vector_modes(vectors: np.ndarray, k: int = 10, rescore_factor: int = 4) -> Dict[str, Dict[str, float]]:
+    report: Dict[str, Dict[str, float]] = {}
+    for dtype in VECTOR_DTYPES:
+        codes, scale, offset = quantize(vectors, dtype)
+        nbytes = codes.nbytes + sum(a.nbytes for a in (scale, offset) if a is not None)
+        report[dtype] = {
+            "memory_bytes": float(nbytes),
+            "recall": evaluate_recall(vectors, dtype, k=k, rescore_factor=rescore_factor),
+        }
+    return report
+
+
+def is_compact_store(folder_path: str) -> bool:
+    return os.path.exists(os.path.join(folder_path, META_FILE))
+
+
+class CompactVectorStore:
+    """Векторное хранилище с float16/int8 векторами в памяти и float32 копией на диске."""
+
+    def __init__(self, embeddings: Any, vectors: QuantizedVectors, chunks: ChunkStore):
+        self.embeddings = embeddings
+        self.vectors = vectors
+        self.chunks = chunks
+
+    @classmethod
+    def from_documents(
+        cls, docs: Sequence[Document], embeddings: Any, dtype: str, rescore_factor: int = 4
+    ) -> "CompactVectorStore":
+        raw = embeddings.embed_documents([doc.page_content for doc in docs])
+        full_vectors = np.asarray(raw, dtype=np.float32).reshape(len(docs), -1)
+        vectors = QuantizedVectors.from_vectors(full_vectors, dtype, rescore_factor)
+        return cls(embeddings, vectors, ChunkStore.from_documents(docs))
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: Sequence[float], k: int = 4
+    ) -> List[Tuple[Document, float]]:
+        indices, distances = self.vectors.search(np.asarray(embedding, dtype=np.float32), k)
+        return [(self.chunks.document(int(i)), float(d)) for i, d in zip(indices, distances)]
+
+    def similarity_search_by_vector(self, embedding: Sequence[float], k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {
+            "vectors": self.vectors.nbytes(),
+            "chunks": self.chunks.nbytes(),
+            "full_vectors_on_disk": int(self.vectors.full_vectors.nbytes),
+        }
+
+    def save_local(self, folder_path: str) -> None:
+        os.makedirs(folder_path, exist_ok=True)
+        np.save(os.path.join(folder_path, CODES_FILE), self.vectors.codes)
+        np.save(os.path.join(folder_path, FULL_VECTORS_FILE), np.asarray(self.vectors.full_vectors))
+
+        meta: Dict[str, Any] = {"dtype": self.vectors.dtype}
+        if self.vectors.scale is not None and self.vectors.offset is not None:
+            meta["scale"] = self.vectors.scale.tolist()
+            meta["offset"] = self.vectors.offset.tolist()
+        with open(os.path.join(folder_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with open(os.path.join(folder_path, CHUNKS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.chunks.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load_local(cls, folder_path: str, embeddings: Any, rescore_factor: int = 4) -> "CompactVectorStore":
+        with open(os.path.join(folder_path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(folder_path, CHUNKS_FILE), encoding="utf-8") as f:
+            chunks = ChunkStore.from_dict(json.load(f))
+
+        scale = np.asarray(meta["scale"], dtype=np.float32) if "scale" in meta else None
+        offset = np.asarray(meta["offset"], dtype=np.float32) if "offset" in meta else None
+        vectors = QuantizedVectors(
+            codes=np.load(os.path.join(folder_path, CODES_FILE)),
+            # float32 копия читается с диска только для кандидатов на пересчёт
+            full_vectors=np.load(os.path.join(folder_path, FULL_VECTORS_FILE), mmap_mode="r"),
+            dtype=meta["dtype"],
+            scale=scale,
+            offset=offset,
+            rescore_factor=rescore_factor,
+        )
+        return cls(embeddings, vectors, chunks)
@@ -1,19 +1,20 @@
 
 import logging
 import os
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
+from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_community.llms import Together
 from langchain_core.documents import Document
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors.base import BaseDocumentCompressor
 from src.rag_main.rag_reranker import RAGReranker
+from src.rag_main.rag_compact_store import CompactVectorStore, is_compact_store
+from src.rag_main.rag_query_normalizer import LEXICON_FILE, load_lexicon
+from src.rag_main.rag_session import RAGSession, looks_like_follow_up
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -27,26 +28,84 @@ class RAGConfig:
     top_k: int = 3
     llm_model: str = "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
     max_tokens: int = 512
+    rescore_factor: int = int(os.getenv("RESCORE_FACTOR", "4"))
+    normalize_queries: bool = os.getenv("NORMALIZE_QUERIES", "true").lower() == "true"
+    followup_threshold: float = float(os.getenv("FOLLOWUP_THRESHOLD", "0.5"))
+    short_followup_threshold: float = float(os.getenv("FOLLOWUP_SHORT_THRESHOLD", "0.3"))
+    context_threshold: float = float(os.getenv("FOLLOWUP_CONTEXT_THRESHOLD", "0.35"))
 
-def get_rag_answer(query: str, config: RAGConfig) -> str:
+# Как получить фрагменты для ответа в сессии
+REUSE = "reuse"
+EXTEND = "extend"
+NEW_TOPIC = "new_topic"
+
+@dataclass
+class RAGAnswer:
+    answer: str
+    sources: List[str] = field(default_factory=list)
+    context_mode: str = NEW_TOPIC
+
+def normalize_query(query: str, config: RAGConfig) -> str:
+    if not config.normalize_queries:
+        return query
+    lexicon = load_lexicon(os.path.join(config.vector_store_path, LEXICON_FILE))
+    return lexicon.normalize(query) or query
+
+def collect_sources(docs: List[Document]) -> List[str]:
+    sources: List[str] = []
+    for doc in docs:
+        if "article" in doc.metadata:
+            source = f"Статья {doc.metadata['article']}"
+        elif "page" in doc.metadata:
+            source = f"стр. {doc.metadata['page'] + 1}"
+        else:
+            continue
+        if source not in sources:
+            sources.append(source)
+    return sources
+
+def choose_context_mode(query: str, query_vector: List[float], session: Optional[RAGSession],
+                        embeddings, config: RAGConfig) -> str:
+    if session is None or not session.docs:
+        return NEW_TOPIC
+    # Короткое уточнение с союзом только снижает порог близости к теме, но не отменяет его
+    threshold = config.short_followup_threshold if looks_like_follow_up(query) else config.followup_threshold
+    if session.topic_similarity(query_vector) < threshold:
+        return NEW_TOPIC
+    if session.context_similarity(query_vector, embeddings.embed_documents) >= config.context_threshold:
+        return REUSE
+    return EXTEND
+
+def get_rag_answer(query: str, config: RAGConfig, session: Optional[RAGSession] = None) -> RAGAnswer:
     logger.info("Загрузка индекса")
     embeddings = HuggingFaceEmbeddings(model_name=config.embedding_model)
-    db = FAISS.load_local(config.vector_store_path, embeddings, allow_dangerous_deserialization=True)
+    # Формат хранилища берётся из файлов индекса, а не из VECTOR_DTYPE, который задаётся при индексации
+    if is_compact_store(config.vector_store_path):
+        db = CompactVectorStore.load_local(config.vector_store_path, embeddings, config.rescore_factor)
+    else:
+        db = FAISS.load_local(config.vector_store_path, embeddings, allow_dangerous_deserialization=True)
 
-    retriever = db.as_retriever(search_kwargs={"k": config.top_k * 3})
-    raw_docs = retriever.invoke(query)
+    search_query = normalize_query(query, config)
+    query_vector = embeddings.embed_query(search_query)
 
-    reranker = RAGReranker(config.rerank_model)
-    reranked_docs = reranker.rerank(query, raw_docs, top_k=config.top_k)
+    mode = choose_context_mode(query, query_vector, session, embeddings, config)
+    question = query
+    if session is not None and mode == REUSE:
+        reranked_docs = session.docs
+    else:
+        raw_docs = db.similarity_search_by_vector(query_vector, k=config.top_k * 3)
+        rerank_query = search_query
+        if session is not None and mode == EXTEND:
+            # Новые кандидаты переранжируются вместе с фрагментами темы по вопросу с контекстом
+            seen = {doc.page_content for doc in session.docs}
+            raw_docs = session.docs + [doc for doc in raw_docs if doc.page_content not in seen]
+            rerank_query = f"{normalize_query(session.question, config)} {search_query}"
 
-    class FixedCompressor(BaseDocumentCompressor):
-        def compress_documents(self, documents: List[Document], query: str, *, callbacks=None, **kwargs) -> List[Document]:
-            return reranked_docs
+        reranker = RAGReranker(config.rerank_model)
+        reranked_docs = reranker.rerank(rerank_query, raw_docs, top_k=config.top_k)
 
-    compression_retriever = ContextualCompressionRetriever(
-        base_compressor=FixedCompressor(),
-        base_retriever=retriever
-    )
+    if session is not None and mode != NEW_TOPIC:
+        question = f"{session.question}\nУточнение: {query}"
 
     llm = Together(
         model=config.llm_model,
@@ -67,13 +126,18 @@ def get_rag_answer(query: str, config: RAGConfig) -> str:
         input_variables=["context", "question"]
     )
 
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=compression_retriever,
-        chain_type_kwargs={"prompt": prompt},
-        return_source_documents=False
-    )
+    # Фрагменты уже найдены и переранжированы, поэтому цепочка только подставляет их в промпт
+    qa_chain = create_stuff_documents_chain(llm, prompt)
+
+    answer = qa_chain.invoke({"context": reranked_docs, "question": question})
 
-    result = qa_chain.invoke({"query": query})
-    return result["result"]
+    # Сессия обновляется только после успешного ответа
+    if session is not None:
+        if mode == NEW_TOPIC:
+            session.start_topic(query, query_vector, reranked_docs)
+        elif mode == EXTEND:
+            session.extend(reranked_docs)
+        else:
+            session.turns += 1
+        logger.info(f"Сессия: ход {session.turns} темы, фрагменты: {mode}")
+    return RAGAnswer(answer, collect_sources(reranked_docs), mode)
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+LEXICON_FILE = "lexicon.json"
+
+NUMBER_RE = re.compile(r"\d+(?:[-.,]\d+)*")
+# Номера статей и дроби («8-1», «0.5») остаются одним токеном
+WORD_RE = re.compile(rf"{NUMBER_RE.pattern}|\w+")
+ACRONYM_RE = re.compile(r"\b[А-ЯЁ]{2,6}\b")
+CYRILLIC_RE = re.compile(r"[а-яё]")
+
+# Латинские буквы, которые на клавиатуре и на экране не отличить от кириллических
+HOMOGLYPHS = str.maketrans({
+    "a": "а", "b": "в", "c": "с", "e": "е", "h": "н", "k": "к", "m": "м",
+    "o": "о", "p": "р", "t": "т", "x": "х", "y": "у",
+})
+
+DEFAULT_ABBREVIATIONS: Dict[str, str] = {
+    "тк": "трудовой кодекс",
+    "гк": "гражданский кодекс",
+    "ук": "уголовный кодекс",
+    "нк": "налоговый кодекс",
+    "упк": "уголовно процессуальный кодекс",
+    "гпк": "гражданский процессуальный кодекс",
+    "коап": "кодекс об административных правонарушениях",
+    "рк": "республики казахстан",
+    "ст": "статья",
+}
+
+MIN_WORD_FREQ = 2
+MIN_TYPO_LEN = 4
+MAX_ABBREVIATION_WORDS = 6
+# Правки в последних буквах чаще означают другую словоформу, а не опечатку
+INFLECTION_LEN = 2
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    return WORD_RE.findall(text)
+
+
+def _deletes(word: str) -> List[str]:
+    return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Расстояние Дамерау-Левенштейна (с ограничением на транспозиции) не больше 1."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _differs_in_ending(a: str, b: str) -> bool:
+    prefix = len(os.path.commonprefix([a, b]))
+    suffix = len(os.path.commonprefix([a[::-1], b[::-1]]))
+    return prefix >= min(len(a), len(b)) - INFLECTION_LEN and suffix < INFLECTION_LEN
+
+
+def extract_abbreviations(texts: Iterable[str]) -> Dict[str, str]:
+    """Находит аббревиатуры в тексте и расшифровывает их по фразам с совпадающими первыми буквами."""
+    texts = list(texts)
+    acronyms = set()
+    for text in texts:
+        acronyms.update(match.group(0).casefold().replace("ё", "е") for match in ACRONYM_RE.finditer(text))
+    if not acronyms:
+        return {}
+
+    phrases: Dict[str, Counter] = {acronym: Counter() for acronym in acronyms}
+    for text in texts:
+        words = tokenize(text)
+        for i in range(len(words)):
+            initials = ""
+            for n in range(1, MAX_ABBREVIATION_WORDS + 1):
+                if i + n > len(words):
+                    break
+                initials += words[i + n - 1][0]
+                if n > 1 and initials in phrases:
+                    phrases[initials][" ".join(words[i:i + n])] += 1
+
+    result = {}
+    for acronym, counter in phrases.items():
+        if counter:
+            phrase, count = counter.most_common(1)[0]
+            if count >= MIN_WORD_FREQ:
+                result[acronym] = phrase
+    return result
+
+
+class QueryLexicon:
+    """Словарь юридических терминов для нормализации запросов: расшифровка сокращений и исправление опечаток."""
+
+    def __init__(self, vocabulary: Optional[Dict[str, int]] = None, abbreviations: Optional[Dict[str, str]] = None):
+        self.vocabulary: Dict[str, int] = dict(vocabulary or {})
+        self.abbreviations: Dict[str, str] = {**(abbreviations or {}), **DEFAULT_ABBREVIATIONS}
+        for expansion in self.abbreviations.values():
+            for word in expansion.split():
+                self.vocabulary.setdefault(word, MIN_WORD_FREQ)
+
+        self._deletes: Dict[str, List[str]] = {}
+        for word in self.vocabulary:
+            if len(word) >= MIN_TYPO_LEN:
+                for deleted in _deletes(word):
+                    self._deletes.setdefault(deleted, []).append(word)
+
+    @classmethod
+    def from_documents(cls, docs: Sequence[Document], min_freq: int = MIN_WORD_FREQ) -> "QueryLexicon":
+        texts = [doc.page_content for doc in docs]
+        counts: Counter = Counter()
+        for text in texts:
+            counts.update(word for word in tokenize(text) if not NUMBER_RE.fullmatch(word))
+        vocabulary = {word: count for word, count in counts.items() if count >= min_freq}
+        return cls(vocabulary, extract_abbreviations(texts))
+
+    def _fix_script(self, token: str, cyrillic_query: bool) -> str:
+        if not cyrillic_query or not token.isalpha():
+            return token
+        if CYRILLIC_RE.search(token):
+            return token.translate(HOMOGLYPHS)
+        converted = token.translate(HOMOGLYPHS)
+        if not re.search(r"[a-z]", converted) and (converted in self.vocabulary or converted in self.abbreviations):
+            return converted
+        return token
+
+    def correct(self, token: str) -> str:
+        if token in self.vocabulary or len(token) < MIN_TYPO_LEN or not token.isalpha():
+            return token
+
+        candidates = set(self._deletes.get(token, []))
+        for deleted in _deletes(token):
+            if deleted in self.vocabulary:
+                candidates.add(deleted)
+            candidates.update(self._deletes.get(deleted, []))
+
+        best = max(
+            (word for word in candidates if _within_one_edit(token, word) and not _differs_in_ending(token, word)),
+            key=lambda word: (self.vocabulary[word], word),
+            default=None,
+        )
+        return best or token
+
+    def normalize(self, query: str) -> str:
+        tokens = tokenize(query)
+        cyrillic_query = any(CYRILLIC_RE.search(token) for token in tokens)
+        tokens = [self._fix_script(token, cyrillic_query) for token in tokens]
+
+        result: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for n in (3, 2, 1):
+                key = " ".join(tokens[i:i + n])
+                if i + n <= len(tokens) and key in self.abbreviations:
+                    result.append(self.abbreviations[key])
+                    i += n
+                    break
+            else:
+                result.append(self.correct(tokens[i]))
+                i += 1
+        return " ".join(result)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"vocabulary": self.vocabulary, "abbreviations": self.abbreviations}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "QueryLexicon":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["vocabulary"], data["abbreviations"])
+
+
+@lru_cache(maxsize=4)
+def load_lexicon(path: str) -> QueryLexicon:
+    if not os.path.exists(path):
+        logger.warning(f"Словарь {path} не найден, используются только стандартные сокращения")
+        return QueryLexicon()
+    return QueryLexicon.load(path)
@@ -0,0 +1,90 @@
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from src.rag_main.rag_query_normalizer import tokenize
+
+# Уточнения в чате обычно короткие и начинаются с союза: «а если...», «а что...», «но...».
+# «если» и «и» сюда не входят: с них часто начинаются самостоятельные вопросы
+FOLLOW_UP_WORDS = {"а", "но", "тогда", "еще", "также"}
+FOLLOW_UP_MAX_WORDS = 8
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def looks_like_follow_up(question: str) -> bool:
+    words = tokenize(question)
+    return 0 < len(words) <= FOLLOW_UP_MAX_WORDS and words[0] in FOLLOW_UP_WORDS
+
+
+@dataclass
+class RAGSession:
+    """Состояние диалога: вопрос, с которого началась тема, и переранжированные фрагменты закона."""
+
+    question: str = ""
+    topic_vector: Optional[List[float]] = None
+    docs: List[Document] = field(default_factory=list)
+    doc_vectors: Optional[List[List[float]]] = None
+    turns: int = 0
+
+    def topic_similarity(self, query_vector: Sequence[float]) -> float:
+        if self.topic_vector is None:
+            return 0.0
+        return cosine_similarity(self.topic_vector, query_vector)
+
+    def context_similarity(
+        self, query_vector: Sequence[float], embed_documents: Callable[[List[str]], List[List[float]]]
+    ) -> float:
+        if not self.docs:
+            return 0.0
+        if self.doc_vectors is None:
+            # Векторы фрагментов считаются один раз на тему, при первом уточнении
+            self.doc_vectors = embed_documents([doc.page_content for doc in self.docs])
+        return max(cosine_similarity(vector, query_vector) for vector in self.doc_vectors)
+
+    def start_topic(self, question: str, query_vector: Sequence[float], docs: List[Document]) -> None:
+        self.question = question
+        self.topic_vector = list(query_vector)
+        self.docs = docs
+        self.doc_vectors = None
+        self.turns = 1
+
+    def extend(self, docs: List[Document]) -> None:
+        self.docs = docs
+        self.doc_vectors = None
+        self.turns += 1
+
+
+class SessionStore:
+    """Сессии в памяти процесса с вытеснением давно неактивных."""
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, RAGSession]" = OrderedDict()
+        self._last_seen: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> RAGSession:
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is None or now - self._last_seen[session_id] > self.ttl:
+            session = RAGSession()
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._last_seen[session_id] = now
+
+        while len(self._sessions) > self.max_sessions:
+            oldest, _ = self._sessions.popitem(last=False)
+            del self._last_seen[oldest]
+        return session
@@ -1,19 +1,25 @@
 import logging
 import os
+import re
 from dataclasses import dataclass
 from typing import List
 
+import numpy as np
 from dotenv import load_dotenv
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.schema import Document
+from src.rag_main.rag_compact_store import CompactVectorStore, compare_vector_modes
+from src.rag_main.rag_query_normalizer import LEXICON_FILE, QueryLexicon
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ARTICLE_RE = re.compile(r"^\s*Статья\s+(\d+(?:-\d+)?)\.", re.MULTILINE)
+
 @dataclass
 class RAGConfig:
     pdf_path: str = os.getenv("PDF_PATH", "src/datasets/kodeks.pdf")
@@ -21,6 +27,8 @@ class RAGConfig:
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "1000"))
     chunk_overlap: int = int(os.getenv("CHUNK_OVERLAP", "150"))
+    vector_dtype: str = os.getenv("VECTOR_DTYPE", "float32")
+    rescore_factor: int = int(os.getenv("RESCORE_FACTOR", "4"))
 
 def load_pdf(config: RAGConfig) -> List[Document]:
     logger.info("Загрузка PDF")
@@ -36,17 +44,55 @@ def split_docs(docs: List[Document], config: RAGConfig) -> List[Document]:
         chunk_size=config.chunk_size,
         chunk_overlap=config.chunk_overlap
     )
-    return splitter.split_documents(docs)
+    return assign_articles(splitter.split_documents(docs))
+
+def assign_articles(chunks: List[Document]) -> List[Document]:
+    current = None
+    for chunk in chunks:
+        headers = list(ARTICLE_RE.finditer(chunk.page_content))
+        if headers and not chunk.page_content[:headers[0].start()].strip():
+            article = headers[0].group(1)
+        else:
+            article = current or (headers[0].group(1) if headers else None)
+        if article:
+            chunk.metadata["article"] = article
+        if headers:
+            current = headers[-1].group(1)
+    return chunks
 
 def build_faiss_index(docs: List[Document], config: RAGConfig):
     logger.info("Создание FAISS индекса")
     embeddings = HuggingFaceEmbeddings(model_name=config.embedding_model)
-    db = FAISS.from_documents(docs, embeddings)
+    if config.vector_dtype == "float32":
+        db = FAISS.from_documents(docs, embeddings)
+        report_vector_modes(db.index.reconstruct_n(0, db.index.ntotal), config)
+    else:
+        db = CompactVectorStore.from_documents(
+            docs, embeddings, config.vector_dtype, rescore_factor=config.rescore_factor
+        )
+        report_vector_modes(db.vectors.full_vectors, config)
+        usage = db.memory_usage()
+        logger.info(f"Хранилище {config.vector_dtype}: векторы {usage['vectors']} Б, чанки {usage['chunks']} Б")
     db.save_local(config.vector_store_path)
     logger.info("Индекс сохранён")
 
+def build_query_lexicon(docs: List[Document], config: RAGConfig):
+    logger.info("Создание словаря терминов")
+    lexicon = QueryLexicon.from_documents(docs)
+    lexicon.save(os.path.join(config.vector_store_path, LEXICON_FILE))
+    logger.info(f"Словарь сохранён: {len(lexicon.vocabulary)} слов, {len(lexicon.abbreviations)} сокращений")
+
+def report_vector_modes(vectors: np.ndarray, config: RAGConfig):
+    report = compare_vector_modes(vectors, rescore_factor=config.rescore_factor)
+    for dtype, stats in report.items():
+        logger.info(
+            f"Векторы {dtype}: {stats['memory_bytes'] / 1024:.1f} КБ, "
+            f"recall@10 = {stats['recall']:.3f} (пересчёт x{config.rescore_factor})"
+        )
+
 if __name__ == "__main__":
     config = RAGConfig()
     docs = load_pdf(config)
     chunks = split_docs(docs, config)
     build_faiss_index(chunks, config)
+    build_query_lexicon(docs, config)
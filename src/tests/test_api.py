@@ -1,7 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
-from src.app.main import app
+from unittest.mock import patch
+from src.app.main import app, config, sessions
+from src.rag_main.rag_inference import RAGAnswer
 
 client = TestClient(app)
 
@@ -23,7 +24,9 @@ class TestQuestionEndpoint:
     def test_get_question_success(self):
         """Тест успешного запроса вопроса"""
         with patch('src.app.main.get_rag_answer') as mock_get_answer:
-            mock_get_answer.return_value = "Это тестовый ответ на юридический вопрос."
+            mock_get_answer.return_value = RAGAnswer(
+                "Это тестовый ответ на юридический вопрос.", ["Статья 12"]
+            )
             
             response = client.post(
                 "/get_question",
@@ -32,13 +35,28 @@ class TestQuestionEndpoint:
             
             assert response.status_code == 200
             assert response.json() == {
-                "answer": "Это тестовый ответ на юридический вопрос."
+                "answer": "Это тестовый ответ на юридический вопрос.",
+                "sources": ["Статья 12"]
             }
             mock_get_answer.assert_called_once_with(
                 "Какие документы нужны для регистрации ООО?",
-                Mock()  #config
+                config,
+                None
             )
     
+    def test_get_question_with_session(self):
+        """Тест передачи сессии диалога между запросами"""
+        with patch('src.app.main.get_rag_answer') as mock_get_answer:
+            mock_get_answer.return_value = RAGAnswer("Ответ")
+            
+            client.post("/get_question", json={"question": "Первый вопрос", "session_id": "chat-1"})
+            client.post("/get_question", json={"question": "А если иначе?", "session_id": "chat-1"})
+            
+            first_session = mock_get_answer.call_args_list[0].args[2]
+            second_session = mock_get_answer.call_args_list[1].args[2]
+            assert first_session is second_session
+            assert first_session is sessions.get("chat-1")
+    
     def test_get_question_missing_question(self):
         """Тест запроса без вопроса"""
         response = client.post(
@@ -89,6 +107,7 @@ class TestAPIValidation:
         
         valid_request = QuestionRequest(question="Валидный вопрос")
         assert valid_request.question == "Валидный вопрос"
+        assert valid_request.session_id is None
         
         empty_request = QuestionRequest(question="")
         assert empty_request.question == ""
@@ -99,6 +118,7 @@ class TestAPIValidation:
         
         response = AnswerResponse(answer="Тестовый ответ")
         assert response.answer == "Тестовый ответ"
+        assert response.sources == []
 
 
 class TestAPIDocumentation:
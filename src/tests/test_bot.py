@@ -1,6 +1,7 @@
 import pytest
 import os
 from unittest.mock import Mock, patch, AsyncMock
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, User, Chat
 from src.app.bot import start, handle_question
 
@@ -20,17 +21,27 @@ class TestBotHandlers:
         message.reply = AsyncMock()
         return message
     
+    @pytest.fixture
+    def mock_state(self):
+        """Фикстура для создания мок-состояния FSM"""
+        state = Mock(spec=FSMContext)
+        state.get_data = AsyncMock(return_value={})
+        state.update_data = AsyncMock()
+        state.clear = AsyncMock()
+        return state
+    
     @pytest.mark.asyncio
-    async def test_start_command(self, mock_message):
+    async def test_start_command(self, mock_message, mock_state):
         """Тест команды /start"""
-        await start(mock_message)
+        await start(mock_message, mock_state)
         
+        mock_state.clear.assert_awaited_once()
         mock_message.answer.assert_called_once_with(
             "👋 Привет! Отправь юридический вопрос, и я постараюсь ответить согласно закону."
         )
     
     @pytest.mark.asyncio
-    async def test_handle_question_success(self, mock_message):
+    async def test_handle_question_success(self, mock_message, mock_state):
         """Тест успешной обработки вопроса"""
         mock_message.text = "Какие документы нужны для регистрации ООО?"
         
@@ -47,14 +58,14 @@ class TestBotHandlers:
             
             mock_session.return_value.post.return_value = mock_context
             
-            await handle_question(mock_message)
+            await handle_question(mock_message, mock_state)
             
             mock_message.reply.assert_called_once_with(
                 "⚖️ <b>Ответ:</b>\nДля регистрации ООО необходимы следующие документы..."
             )
     
     @pytest.mark.asyncio
-    async def test_handle_question_api_error(self, mock_message):
+    async def test_handle_question_api_error(self, mock_message, mock_state):
         """Тест обработки ошибки API"""
         mock_message.text = "Тестовый вопрос"
         
@@ -68,38 +79,38 @@ class TestBotHandlers:
             
             mock_session.return_value.post.return_value = mock_context
             
-            await handle_question(mock_message)
+            await handle_question(mock_message, mock_state)
             
             mock_message.reply.assert_called_once_with(
                 "⚠️ Не удалось получить ответ. Попробуй позже."
             )
     
     @pytest.mark.asyncio
-    async def test_handle_question_connection_error(self, mock_message):
+    async def test_handle_question_connection_error(self, mock_message, mock_state):
         """Тест обработки ошибки соединения"""
         mock_message.text = "Тестовый вопрос"
         
         with patch('src.app.bot.aiohttp.ClientSession') as mock_session:
             mock_session.side_effect = Exception("Connection error")
             
-            await handle_question(mock_message)
+            await handle_question(mock_message, mock_state)
             
             mock_message.reply.assert_called_once_with(
                 "❌ Внутренняя ошибка сервера. Попробуй позже."
             )
     
     @pytest.mark.asyncio
-    async def test_handle_question_empty_text(self, mock_message):
+    async def test_handle_question_empty_text(self, mock_message, mock_state):
         """Тест обработки пустого текста"""
         mock_message.text = "   "  # Только пробелы
         
-        await handle_question(mock_message)
+        await handle_question(mock_message, mock_state)
         
         # Должен быть вызван API с пустой строкой
         mock_message.reply.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_handle_question_strips_whitespace(self, mock_message):
+    async def test_handle_question_strips_whitespace(self, mock_message, mock_state):
         """Тест удаления лишних пробелов"""
         mock_message.text = "  Вопрос с пробелами  "
         
@@ -114,12 +125,63 @@ class TestBotHandlers:
             
             mock_session.return_value.post.return_value = mock_context
             
-            await handle_question(mock_message)
+            await handle_question(mock_message, mock_state)
             
             # Проверяем, что в API отправляется текст без лишних пробелов
             mock_session.return_value.post.assert_called_once()
             call_args = mock_session.return_value.post.call_args
             assert "Вопрос с пробелами" in str(call_args)
+    
+    @pytest.mark.asyncio
+    async def test_handle_question_session_and_sources(self, mock_message, mock_state):
+        """Тест передачи сессии диалога и вывода источников"""
+        mock_message.text = "А если работник несовершеннолетний?"
+        mock_state.get_data.return_value = {"session_id": "123456:abc"}
+        
+        with patch('src.app.bot.aiohttp.ClientSession') as mock_session:
+            mock_response = AsyncMock()
+            mock_response.status = 200
+            mock_response.json = AsyncMock(return_value={
+                "answer": "Ответ",
+                "sources": ["Статья 31", "Статья 32"]
+            })
+            
+            mock_context = AsyncMock()
+            mock_context.__aenter__.return_value = mock_response
+            mock_context.__aexit__.return_value = None
+            
+            mock_session.return_value.__aenter__.return_value = mock_session.return_value
+            mock_session.return_value.post.return_value = mock_context
+            
+            await handle_question(mock_message, mock_state)
+            
+            payload = mock_session.return_value.post.call_args.kwargs["json"]
+            assert payload["session_id"] == "123456:abc"
+            mock_state.update_data.assert_not_called()
+            mock_message.reply.assert_called_once_with(
+                "⚖️ <b>Ответ:</b>\nОтвет\n\n📚 <b>Источники:</b> Статья 31, Статья 32"
+            )
+    
+    @pytest.mark.asyncio
+    async def test_handle_question_creates_session(self, mock_message, mock_state):
+        """Тест создания сессии при первом вопросе в чате"""
+        mock_message.text = "Вопрос"
+        
+        with patch('src.app.bot.aiohttp.ClientSession') as mock_session:
+            mock_response = AsyncMock()
+            mock_response.status = 500
+            
+            mock_context = AsyncMock()
+            mock_context.__aenter__.return_value = mock_response
+            mock_context.__aexit__.return_value = None
+            
+            mock_session.return_value.__aenter__.return_value = mock_session.return_value
+            mock_session.return_value.post.return_value = mock_context
+            
+            await handle_question(mock_message, mock_state)
+        
+        session_id = mock_state.update_data.call_args.kwargs["session_id"]
+        assert session_id.startswith("123456:")
 
 
 class TestBotConfiguration:
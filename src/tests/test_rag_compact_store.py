@@ -0,0 +1,166 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock, patch
+from langchain.schema import Document
+from src.rag_main.rag_compact_store import (
+    ChunkStore,
+    CompactVectorStore,
+    QuantizedVectors,
+    compare_vector_modes,
+    evaluate_recall,
+    exact_search,
+    is_compact_store,
+    quantize,
+)
+
+
+@pytest.fixture
+def vectors():
+    """Фикстура со случайными векторами размерности эмбеддингов"""
+    rng = np.random.default_rng(42)
+    return rng.normal(size=(300, 384)).astype(np.float32)
+
+
+@pytest.fixture
+def docs():
+    """Фикстура с чанками документа"""
+    return [
+        Document(page_content="Статья 1. Трудовой договор", metadata={"source": "kodeks.pdf", "page": 0, "article": "1"}),
+        Document(page_content="Статья 2. Рабочее время", metadata={"source": "kodeks.pdf", "page": 1}),
+        Document(page_content="Статья 3. Отпуск", metadata={"source": "other.pdf"}),
+    ]
+
+
+class TestChunkStore:
+    """Тесты для компактного хранилища чанков"""
+
+    def test_roundtrip_documents(self, docs):
+        """Тест восстановления Document из хранилища"""
+        store = ChunkStore.from_documents(docs)
+
+        assert len(store) == 3
+        assert store.text(1) == "Статья 2. Рабочее время"
+        assert store.document(0).metadata == {"source": "kodeks.pdf", "page": 0, "article": "1"}
+        assert store.document(2).metadata == {"source": "other.pdf"}
+
+    def test_to_dict_from_dict(self, docs):
+        """Тест сериализации хранилища"""
+        store = ChunkStore.from_documents(docs)
+        restored = ChunkStore.from_dict(store.to_dict())
+
+        assert [restored.text(i) for i in range(3)] == [doc.page_content for doc in docs]
+
+    def test_uses_slots(self, docs):
+        """Тест отсутствия __dict__ у хранилища"""
+        store = ChunkStore.from_documents(docs)
+
+        assert not hasattr(store, "__dict__")
+        assert store.nbytes() > 0
+
+
+class TestQuantization:
+    """Тесты квантования векторов"""
+
+    def test_float16(self, vectors):
+        """Тест перевода в float16"""
+        codes, scale, offset = quantize(vectors, "float16")
+
+        assert codes.dtype == np.float16
+        assert codes.nbytes == vectors.nbytes // 2
+        assert scale is None and offset is None
+
+    def test_int8_reconstruction(self, vectors):
+        """Тест точности восстановления int8"""
+        codes, scale, offset = quantize(vectors, "int8")
+        restored = (codes.astype(np.float32) + 128.0) * scale + offset
+
+        assert codes.dtype == np.int8
+        assert np.abs(restored - vectors).max() <= scale.max()
+
+    def test_unknown_dtype(self, vectors):
+        """Тест неподдерживаемого типа"""
+        with pytest.raises(ValueError):
+            quantize(vectors, "int4")
+
+
+class TestQuantizedVectors:
+    """Тесты поиска с пересчётом в float32"""
+
+    @pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+    def test_search_matches_exact(self, vectors, dtype):
+        """Тест совпадения с точным поиском"""
+        index = QuantizedVectors.from_vectors(vectors, dtype, rescore_factor=4)
+        indices, distances = index.search(vectors[7], k=5)
+
+        assert indices[0] == 7
+        assert list(indices) == list(exact_search(vectors, vectors[7], 5))
+        assert np.all(np.diff(distances) >= 0)
+
+    def test_search_empty(self):
+        """Тест поиска в пустом индексе"""
+        index = QuantizedVectors.from_vectors(np.empty((0, 4), dtype=np.float32), "int8")
+        indices, _ = index.search(np.zeros(4, dtype=np.float32), k=3)
+
+        assert len(indices) == 0
+
+    def test_recall_and_report(self, vectors):
+        """Тест отчёта по памяти и recall для режимов"""
+        assert evaluate_recall(vectors, "int8", k=10, sample_size=50) >= 0.9
+        assert evaluate_recall(vectors, "float32", k=10, sample_size=50) == 1.0
+
+        report = compare_vector_modes(vectors)
+        assert set(report) == {"float32", "float16", "int8"}
+        assert report["float32"]["recall"] == 1.0
+        assert report["int8"]["memory_bytes"] < report["float16"]["memory_bytes"] < report["float32"]["memory_bytes"]
+
+
+    def test_recall_uses_held_out_queries(self, vectors):
+        """Тест: векторы-запросы не попадают в индекс"""
+        with patch.object(QuantizedVectors, "from_vectors", wraps=QuantizedVectors.from_vectors) as mock_build:
+            evaluate_recall(vectors, "int8", k=10, rescore_factor=2, sample_size=50)
+
+        indexed, dtype, rescore_factor = mock_build.call_args.args
+        assert len(indexed) == len(vectors) - 50
+        assert rescore_factor == 2
+        assert evaluate_recall(vectors[:1], "int8") == 1.0
+
+
+class TestCompactVectorStore:
+    """Тесты сжатого векторного хранилища"""
+
+    @pytest.fixture
+    def embeddings(self):
+        """Фикстура с детерминированными эмбеддингами"""
+        table = {
+            "Статья 1. Трудовой договор": [1.0, 0.0, 0.0],
+            "Статья 2. Рабочее время": [0.0, 1.0, 0.0],
+            "Статья 3. Отпуск": [0.0, 0.0, 1.0],
+        }
+        embeddings = Mock()
+        embeddings.embed_documents.side_effect = lambda texts: [table[t] for t in texts]
+        return embeddings
+
+    def test_similarity_search(self, docs, embeddings):
+        """Тест поиска по запросу"""
+        store = CompactVectorStore.from_documents(docs, embeddings, "int8")
+        result = store.similarity_search_by_vector([0.1, 0.9, 0.0], k=1)
+
+        assert result[0].page_content == "Статья 2. Рабочее время"
+        assert result[0].metadata["page"] == 1
+        assert set(store.memory_usage()) == {"vectors", "chunks", "full_vectors_on_disk"}
+
+    def test_save_and_load(self, docs, embeddings, tmp_path):
+        """Тест сохранения и загрузки хранилища"""
+        store = CompactVectorStore.from_documents(docs, embeddings, "float16")
+        store.save_local(str(tmp_path))
+
+        loaded = CompactVectorStore.load_local(str(tmp_path), embeddings)
+
+        assert loaded.vectors.dtype == "float16"
+        assert isinstance(loaded.vectors.full_vectors, np.memmap)
+        assert is_compact_store(str(tmp_path))
+        assert loaded.similarity_search_by_vector([0.1, 0.9, 0.0], k=1)[0].page_content == "Статья 2. Рабочее время"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
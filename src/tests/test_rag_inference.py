@@ -0,0 +1,192 @@
+import pytest
+from unittest.mock import Mock, patch
+from langchain.schema import Document
+from src.rag_main.rag_inference import (
+    EXTEND,
+    NEW_TOPIC,
+    REUSE,
+    RAGAnswer,
+    RAGConfig,
+    collect_sources,
+    get_rag_answer,
+)
+from src.rag_main.rag_session import RAGSession
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Фикстура с конфигурацией без словаря терминов на диске"""
+    return RAGConfig(vector_store_path=str(tmp_path), normalize_queries=True)
+
+
+@pytest.fixture
+def rag_mocks():
+    """Фикстура с моками модели эмбеддингов, индекса, реранкера и LLM"""
+    docs = [
+        Document(page_content="Статья 31. Отпуск", metadata={"article": "31", "page": 10}),
+        Document(page_content="Статья 32. Отпуск без сохранения", metadata={"article": "32", "page": 11}),
+    ]
+    with patch('src.rag_main.rag_inference.HuggingFaceEmbeddings') as mock_embeddings, \
+            patch('src.rag_main.rag_inference.FAISS') as mock_faiss, \
+            patch('src.rag_main.rag_inference.RAGReranker') as mock_reranker, \
+            patch('src.rag_main.rag_inference.Together'), \
+            patch('src.rag_main.rag_inference.create_stuff_documents_chain') as mock_chain:
+        embeddings = mock_embeddings.return_value
+        embeddings.embed_query.return_value = [1.0, 0.0]
+        db = mock_faiss.load_local.return_value
+        db.similarity_search_by_vector.return_value = docs
+        mock_reranker.return_value.rerank.return_value = docs
+        mock_chain.return_value.invoke.return_value = "Ответ"
+        yield Mock(embeddings=embeddings, db=db, reranker=mock_reranker.return_value,
+                   chain=mock_chain.return_value, docs=docs)
+
+
+class TestCollectSources:
+    """Тесты для функции collect_sources"""
+
+    def test_collect_sources(self):
+        """Тест статей, страниц и удаления дубликатов"""
+        docs = [
+            Document(page_content="a", metadata={"article": "31", "page": 10}),
+            Document(page_content="b", metadata={"article": "31", "page": 11}),
+            Document(page_content="c", metadata={"page": 0}),
+            Document(page_content="d"),
+        ]
+
+        assert collect_sources(docs) == ["Статья 31", "стр. 1"]
+
+
+class TestGetRAGAnswer:
+    """Тесты для функции get_rag_answer"""
+
+    def test_retrieves_once_with_normalized_query(self, config, rag_mocks):
+        """Тест: поиск выполняется один раз и по нормализованному запросу"""
+        result = get_rag_answer("Отпуск по ТК?", config)
+
+        assert result == RAGAnswer("Ответ", ["Статья 31", "Статья 32"], NEW_TOPIC)
+        rag_mocks.embeddings.embed_query.assert_called_once_with("отпуск по трудовой кодекс")
+        rag_mocks.db.similarity_search_by_vector.assert_called_once_with([1.0, 0.0], k=config.top_k * 3)
+        rag_mocks.db.as_retriever.assert_not_called()
+        rag_mocks.reranker.rerank.assert_called_once_with(
+            "отпуск по трудовой кодекс", rag_mocks.docs, top_k=config.top_k
+        )
+        rag_mocks.chain.invoke.assert_called_once_with({"context": rag_mocks.docs, "question": "Отпуск по ТК?"})
+
+    def test_loads_store_format_from_disk(self, config, rag_mocks, tmp_path):
+        """Тест: сжатое хранилище определяется по файлам индекса, а не по VECTOR_DTYPE"""
+        (tmp_path / "store.json").write_text('{"dtype": "int8"}', encoding="utf-8")
+
+        with patch('src.rag_main.rag_inference.CompactVectorStore') as mock_store, \
+                patch('src.rag_main.rag_inference.FAISS') as mock_faiss:
+            mock_store.load_local.return_value.similarity_search_by_vector.return_value = rag_mocks.docs
+            result = get_rag_answer("Отпуск по ТК?", config)
+
+        mock_faiss.load_local.assert_not_called()
+        mock_store.load_local.assert_called_once_with(str(tmp_path), rag_mocks.embeddings, config.rescore_factor)
+        assert result.sources == ["Статья 31", "Статья 32"]
+
+
+class TestSessionTurns:
+    """Тесты повторного использования фрагментов в сессии"""
+
+    @pytest.fixture
+    def session(self, rag_mocks):
+        """Фикстура с сессией, в которой уже есть тема про отпуск"""
+        session = RAGSession()
+        session.start_topic("Сколько дней отпуска?", [1.0, 0.0], list(rag_mocks.docs))
+        return session
+
+    def test_new_question_starts_topic(self, config, rag_mocks):
+        """Тест первого вопроса в сессии"""
+        session = RAGSession()
+
+        result = get_rag_answer("Сколько дней отпуска?", config, session)
+
+        assert result.context_mode == NEW_TOPIC
+        assert session.docs == rag_mocks.docs
+        assert session.turns == 1
+
+    def test_follow_up_reuses_chunks(self, config, rag_mocks, session):
+        """Тест: уточнение не запускает поиск и переранжирование"""
+        rag_mocks.embeddings.embed_query.return_value = [0.9, 0.1]
+        rag_mocks.embeddings.embed_documents.return_value = [[1.0, 0.0], [0.8, 0.2]]
+
+        result = get_rag_answer("а если работник несовершеннолетний?", config, session)
+
+        assert result.context_mode == REUSE
+        assert result.sources == ["Статья 31", "Статья 32"]
+        assert rag_mocks.embeddings.embed_query.call_count == 1
+        rag_mocks.embeddings.embed_documents.assert_called_once()
+        rag_mocks.db.similarity_search_by_vector.assert_not_called()
+        rag_mocks.reranker.rerank.assert_not_called()
+        rag_mocks.chain.invoke.assert_called_once_with({
+            "context": rag_mocks.docs,
+            "question": "Сколько дней отпуска?\nУточнение: а если работник несовершеннолетний?",
+        })
+        assert session.turns == 2
+
+    def test_follow_up_far_from_chunks_extends(self, config, rag_mocks, session):
+        """Тест: уточнение, на которое нет ответа во фрагментах темы, дополняет их новым поиском"""
+        new_doc = Document(page_content="Статья 179. Несовершеннолетние", metadata={"article": "179"})
+        rag_mocks.embeddings.embed_query.return_value = [0.4, 0.9]
+        rag_mocks.embeddings.embed_documents.return_value = [[0.9, -0.4], [1.0, -0.5]]
+        rag_mocks.db.similarity_search_by_vector.return_value = [rag_mocks.docs[0], new_doc]
+        rag_mocks.reranker.rerank.return_value = [new_doc, rag_mocks.docs[0]]
+
+        result = get_rag_answer("а если несовершеннолетний?", config, session)
+
+        assert result.context_mode == EXTEND
+        candidates = rag_mocks.reranker.rerank.call_args.args[1]
+        assert candidates == rag_mocks.docs + [new_doc]
+        assert rag_mocks.reranker.rerank.call_args.args[0].startswith("сколько дней отпуска ")
+        assert session.docs == [new_doc, rag_mocks.docs[0]]
+        assert session.question == "Сколько дней отпуска?"
+
+    def test_unrelated_question_starts_new_topic(self, config, rag_mocks, session):
+        """Тест смены темы"""
+        rag_mocks.embeddings.embed_query.return_value = [0.0, 1.0]
+
+        result = get_rag_answer("Как зарегистрировать ООО?", config, session)
+
+        assert result.context_mode == NEW_TOPIC
+        rag_mocks.embeddings.embed_documents.assert_not_called()
+        rag_mocks.db.similarity_search_by_vector.assert_called_once()
+        assert session.question == "Как зарегистрировать ООО?"
+        assert session.turns == 1
+
+    def test_unrelated_if_question_starts_new_topic(self, config, rag_mocks, session):
+        """Тест: самостоятельный вопрос, начинающийся с «Если», не считается уточнением"""
+        rag_mocks.embeddings.embed_query.return_value = [0.0, 1.0]
+
+        result = get_rag_answer("Если оператор передал мои данные третьим лицам?", config, session)
+
+        assert result.context_mode == NEW_TOPIC
+        rag_mocks.chain.invoke.assert_called_once_with({
+            "context": rag_mocks.docs,
+            "question": "Если оператор передал мои данные третьим лицам?",
+        })
+        assert session.question == "Если оператор передал мои данные третьим лицам?"
+
+    def test_short_follow_up_far_from_topic_starts_new_topic(self, config, rag_mocks, session):
+        """Тест: союз в начале короткого вопроса не отменяет порог близости к теме"""
+        rag_mocks.embeddings.embed_query.return_value = [0.0, 1.0]
+
+        result = get_rag_answer("а как зарегистрировать ООО?", config, session)
+
+        assert result.context_mode == NEW_TOPIC
+
+    def test_session_unchanged_when_llm_fails(self, config, rag_mocks, session):
+        """Тест: при ошибке LLM сессия остаётся на прежней теме"""
+        rag_mocks.embeddings.embed_query.return_value = [0.0, 1.0]
+        rag_mocks.chain.invoke.side_effect = Exception("LLM error")
+
+        with pytest.raises(Exception):
+            get_rag_answer("Как зарегистрировать ООО?", config, session)
+
+        assert session.question == "Сколько дней отпуска?"
+        assert session.topic_vector == [1.0, 0.0]
+        assert session.turns == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
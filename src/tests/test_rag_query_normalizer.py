@@ -0,0 +1,120 @@
+import pytest
+import time
+from langchain.schema import Document
+from src.rag_main.rag_query_normalizer import (
+    QueryLexicon,
+    extract_abbreviations,
+    load_lexicon,
+    tokenize,
+    _within_one_edit,
+)
+
+
+@pytest.fixture
+def lexicon():
+    """Фикстура со словарём, построенным из фрагментов кодекса"""
+    docs = [
+        Document(page_content=(
+            "Трудовой кодекс Республики Казахстан (далее - ТК РК). "
+            "Несовершеннолетний работник вправе заключить трудовой договор. "
+            "Работодатель обязан обеспечить несовершеннолетний работник отпуском."
+        )),
+        Document(page_content=(
+            "Закон о защите прав потребителей (далее - ЗПП). "
+            "Положения о защите прав потребителей. Работодатель вправе расторгнуть трудовой договор."
+        )),
+    ]
+    return QueryLexicon.from_documents(docs)
+
+
+class TestTokenize:
+    """Тесты для приведения текста к токенам"""
+
+    def test_case_and_unicode_folding(self):
+        """Тест приведения регистра, ё и ширины символов"""
+        assert tokenize("  ЁЛКА,  Ｔрудовой   ДОГОВОР?! ") == ["елка", "tрудовой", "договор"]
+
+
+class TestEditDistance:
+    """Тесты проверки расстояния редактирования"""
+
+    @pytest.mark.parametrize("a, b, expected", [
+        ("договор", "договор", True),
+        ("договр", "договор", True),
+        ("договор", "догвоор", True),
+        ("договар", "договор", True),
+        ("дгвр", "договор", False),
+        ("абв", "бвг", False),
+    ])
+    def test_within_one_edit(self, a, b, expected):
+        """Тест замены, вставки, удаления и перестановки"""
+        assert _within_one_edit(a, b) == expected
+
+
+class TestQueryLexicon:
+    """Тесты нормализации запросов"""
+
+    def test_extract_abbreviations(self):
+        """Тест расшифровки аббревиатур из текста"""
+        texts = ["Закон о защите прав потребителей (ЗПП). О защите прав потребителей."]
+
+        assert extract_abbreviations(texts) == {"зпп": "защите прав потребителей"}
+
+    def test_expands_abbreviations(self, lexicon):
+        """Тест расшифровки сокращений в запросе"""
+        assert lexicon.normalize("Что говорит ТК РК?") == "что говорит трудовой кодекс республики казахстан"
+        assert lexicon.normalize("возврат по ЗПП") == "возврат по защите прав потребителей"
+
+    def test_fixes_mixed_scripts(self, lexicon):
+        """Тест замены латинских букв, похожих на кириллицу"""
+        assert lexicon.normalize("Рaботодатель TK PK") == "работодатель трудовой кодекс республики казахстан"
+
+    def test_keeps_latin_words(self, lexicon):
+        """Тест сохранения латинских слов"""
+        assert lexicon.normalize("договор online") == "договор online"
+
+    def test_corrects_typos(self, lexicon):
+        """Тест исправления опечаток по словарю"""
+        assert lexicon.normalize("а если работник несовершенолетний?") == "а если работник несовершеннолетний"
+        assert lexicon.normalize("работадатель обязан") == "работодатель обязан"
+
+    def test_keeps_word_forms(self, lexicon):
+        """Тест сохранения других словоформ словарных слов"""
+        assert lexicon.normalize("работника трудового договора") == "работника трудового договора"
+
+    def test_unknown_words_unchanged(self, lexicon):
+        """Тест неизвестных слов и чисел"""
+        assert lexicon.normalize("статья 152 зарплата") == "статья 152 зарплата"
+
+    def test_keeps_article_numbers(self, lexicon):
+        """Тест сохранения номеров статей и дробных чисел"""
+        assert lexicon.normalize("ст 8-1 тк") == "статья 8-1 трудовой кодекс"
+        assert lexicon.normalize("0.5 ставки") == "0.5 ставки"
+
+    def test_normalization_is_fast(self, lexicon):
+        """Тест скорости нормализации"""
+        query = "Что говорит TK PK если работник несовершенолетний и работадатель не платит?"
+        start = time.perf_counter()
+        for _ in range(100):
+            lexicon.normalize(query)
+
+        assert (time.perf_counter() - start) / 100 < 0.001
+
+    def test_save_and_load(self, lexicon, tmp_path):
+        """Тест сохранения и загрузки словаря"""
+        path = str(tmp_path / "lexicon.json")
+        lexicon.save(path)
+        loaded = QueryLexicon.load(path)
+
+        assert loaded.vocabulary == lexicon.vocabulary
+        assert loaded.abbreviations == lexicon.abbreviations
+
+    def test_load_missing_lexicon(self, tmp_path):
+        """Тест загрузки отсутствующего словаря"""
+        lexicon = load_lexicon(str(tmp_path / "missing.json"))
+
+        assert lexicon.normalize("ТК") == "трудовой кодекс"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import Mock, patch
+from langchain.schema import Document
+from src.rag_main.rag_session import RAGSession, SessionStore, cosine_similarity, looks_like_follow_up
+
+
+class TestCosineSimilarity:
+    """Тесты косинусной близости"""
+
+    def test_cosine_similarity(self):
+        """Тест близости векторов"""
+        assert cosine_similarity([1.0, 0.0], [2.0, 0.0]) == pytest.approx(1.0)
+        assert cosine_similarity([1.0, 0.0], [0.0, 3.0]) == pytest.approx(0.0)
+        assert cosine_similarity([0.0, 0.0], [1.0, 1.0]) == 0.0
+
+
+class TestLooksLikeFollowUp:
+    """Тесты распознавания коротких уточнений"""
+
+    @pytest.mark.parametrize("question, expected", [
+        ("а если работник несовершеннолетний?", True),
+        ("А что с отпуском?", True),
+        ("Но ещё про сверхурочные", True),
+        ("Если оператор передал мои данные третьим лицам?", False),
+        ("И как оформить отпуск?", False),
+        ("Сколько дней длится ежегодный отпуск?", False),
+        ("а если работник несовершеннолетний и работает по совместительству в двух организациях?", False),
+        ("", False),
+    ])
+    def test_looks_like_follow_up(self, question, expected):
+        """Тест коротких вопросов, начинающихся с союза"""
+        assert looks_like_follow_up(question) == expected
+
+
+class TestRAGSession:
+    """Тесты состояния диалога"""
+
+    def test_new_session_has_no_topic(self):
+        """Тест первого вопроса в сессии"""
+        session = RAGSession()
+
+        assert session.topic_similarity([1.0, 0.0]) == 0.0
+        assert session.context_similarity([1.0, 0.0], Mock()) == 0.0
+
+    def test_start_topic_and_extend(self):
+        """Тест начала темы и расширения фрагментов"""
+        session = RAGSession()
+        docs = [Document(page_content="Статья 31. Отпуск", metadata={"article": "31"})]
+        session.start_topic("Сколько дней отпуска?", [1.0, 0.2], docs)
+
+        assert session.topic_similarity([0.9, 0.3]) > 0.9
+        assert session.topic_similarity([0.0, 1.0]) < 0.5
+        assert session.question == "Сколько дней отпуска?"
+        assert session.turns == 1
+
+        new_docs = docs + [Document(page_content="Статья 32. Отпуск без сохранения")]
+        session.extend(new_docs)
+
+        assert session.docs == new_docs
+        assert session.question == "Сколько дней отпуска?"
+        assert session.turns == 2
+
+    def test_context_similarity_embeds_docs_once(self):
+        """Тест: векторы фрагментов темы считаются один раз"""
+        session = RAGSession()
+        docs = [Document(page_content="a"), Document(page_content="b")]
+        session.start_topic("Вопрос", [1.0, 0.0], docs)
+        embed_documents = Mock(return_value=[[1.0, 0.0], [0.0, 1.0]])
+
+        assert session.context_similarity([0.0, 2.0], embed_documents) == pytest.approx(1.0)
+        assert session.context_similarity([1.0, 0.0], embed_documents) == pytest.approx(1.0)
+        embed_documents.assert_called_once_with(["a", "b"])
+
+
+class TestSessionStore:
+    """Тесты хранилища сессий"""
+
+    def test_get_returns_same_session(self):
+        """Тест повторного получения сессии"""
+        store = SessionStore()
+
+        assert store.get("chat-1") is store.get("chat-1")
+        assert store.get("chat-1") is not store.get("chat-2")
+
+    def test_evicts_least_recently_used(self):
+        """Тест вытеснения давно неактивных сессий"""
+        store = SessionStore(max_sessions=2)
+        first = store.get("chat-1")
+        store.get("chat-2")
+        store.get("chat-1")
+        store.get("chat-3")
+
+        assert len(store) == 2
+        assert store.get("chat-1") is first
+
+    def test_expired_session_is_replaced(self):
+        """Тест истечения времени жизни сессии"""
+        store = SessionStore(ttl=10.0)
+        with patch('src.rag_main.rag_session.time.monotonic', return_value=0.0):
+            first = store.get("chat-1")
+        with patch('src.rag_main.rag_session.time.monotonic', return_value=100.0):
+            assert store.get("chat-1") is not first
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
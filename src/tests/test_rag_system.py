@@ -2,7 +2,7 @@ import pytest
 import os
 import tempfile
 from unittest.mock import Mock, patch, MagicMock
-from src.rag_main.rag_system import RAGConfig, load_pdf, split_docs, build_faiss_index
+from src.rag_main.rag_system import RAGConfig, load_pdf, split_docs, build_faiss_index, build_query_lexicon, assign_articles, report_vector_modes
 
 
 class TestRAGConfig:
@@ -17,13 +17,16 @@ class TestRAGConfig:
         assert config.embedding_model == "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
         assert config.chunk_size == 1000
         assert config.chunk_overlap == 150
+        assert config.vector_dtype == "float32"
+        assert config.rescore_factor == 4
     
     @patch.dict(os.environ, {
         'PDF_PATH': '/custom/path/file.pdf',
         'VECTOR_STORE_PATH': '/custom/vectordb',
         'EMBEDDING_MODEL': 'custom/model',
         'CHUNK_SIZE': '500',
-        'CHUNK_OVERLAP': '100'
+        'CHUNK_OVERLAP': '100',
+        'VECTOR_DTYPE': 'int8'
     })
     def test_rag_config_from_env(self):
         """Тест загрузки значений из переменных окружения"""
@@ -34,6 +37,7 @@ class TestRAGConfig:
         assert config.embedding_model == "custom/model"
         assert config.chunk_size == 500
         assert config.chunk_overlap == 100
+        assert config.vector_dtype == "int8"
 
 
 class TestLoadPDF:
@@ -85,12 +89,42 @@ class TestSplitDocs:
             assert len(chunk.page_content) <= config.chunk_size + 50  
 
 
+class TestAssignArticles:
+    """Тесты для функции assign_articles"""
+    
+    def test_assign_articles(self):
+        """Тест привязки чанков к статьям закона"""
+        from langchain.schema import Document
+        
+        chunks = [
+            Document(page_content="Статья 1. Цели Закона\nТекст первой статьи."),
+            Document(page_content="Продолжение первой статьи.\nСтатья 2. Основные понятия"),
+            Document(page_content="Текст второй статьи."),
+            Document(page_content="   Статья 8-1. Согласие\nТекст."),
+        ]
+        
+        result = assign_articles(chunks)
+        
+        assert [chunk.metadata["article"] for chunk in result] == ["1", "1", "2", "8-1"]
+    
+    def test_assign_articles_without_headers(self):
+        """Тест чанков до первой статьи"""
+        from langchain.schema import Document
+        
+        chunks = [Document(page_content="Оглавление"), Document(page_content="Ссылка на статью 5 Закона")]
+        
+        result = assign_articles(chunks)
+        
+        assert all("article" not in chunk.metadata for chunk in result)
+
+
 class TestBuildFAISSIndex:
     """Тесты для функции build_faiss_index"""
     
+    @patch('src.rag_main.rag_system.report_vector_modes')
     @patch('src.rag_main.rag_system.HuggingFaceEmbeddings')
     @patch('src.rag_main.rag_system.FAISS')
-    def test_build_faiss_index(self, mock_faiss, mock_embeddings):
+    def test_build_faiss_index(self, mock_faiss, mock_embeddings, mock_report):
         """Тест создания FAISS индекса"""
         from langchain.schema import Document
         
@@ -98,6 +132,7 @@ class TestBuildFAISSIndex:
         mock_embeddings.return_value = mock_embeddings_instance
         
         mock_faiss_instance = Mock()
+        mock_faiss_instance.index.ntotal = 2
         mock_faiss.from_documents.return_value = mock_faiss_instance
         
         docs = [
@@ -113,8 +148,67 @@ class TestBuildFAISSIndex:
         
         mock_faiss.from_documents.assert_called_once_with(docs, mock_embeddings_instance)
         
+        mock_faiss_instance.index.reconstruct_n.assert_called_once_with(0, 2)
+        mock_report.assert_called_once_with(mock_faiss_instance.index.reconstruct_n.return_value, config)
+        
         mock_faiss_instance.save_local.assert_called_once_with(config.vector_store_path)
 
+    @patch('src.rag_main.rag_system.report_vector_modes')
+    @patch('src.rag_main.rag_system.HuggingFaceEmbeddings')
+    @patch('src.rag_main.rag_system.CompactVectorStore')
+    @patch('src.rag_main.rag_system.FAISS')
+    def test_build_compact_index(self, mock_faiss, mock_store, mock_embeddings, mock_report):
+        """Тест создания сжатого индекса"""
+        from langchain.schema import Document
+
+        mock_store_instance = Mock()
+        mock_store_instance.memory_usage.return_value = {"vectors": 384, "chunks": 100, "full_vectors_on_disk": 1536}
+        mock_store.from_documents.return_value = mock_store_instance
+
+        docs = [Document(page_content="Тестовый документ 1")]
+        config = RAGConfig(vector_dtype="int8", rescore_factor=8)
+
+        build_faiss_index(docs, config)
+
+        mock_faiss.from_documents.assert_not_called()
+        mock_store.from_documents.assert_called_once_with(
+            docs, mock_embeddings.return_value, "int8", rescore_factor=8
+        )
+        mock_report.assert_called_once_with(mock_store_instance.vectors.full_vectors, config)
+        mock_store_instance.save_local.assert_called_once_with(config.vector_store_path)
+
+
+    @patch('src.rag_main.rag_system.compare_vector_modes')
+    def test_report_vector_modes(self, mock_compare):
+        """Тест отчёта по режимам с настроенным коэффициентом пересчёта"""
+        mock_compare.return_value = {
+            "float32": {"memory_bytes": 1536.0, "recall": 1.0},
+            "int8": {"memory_bytes": 384.0, "recall": 0.98},
+        }
+        vectors = Mock()
+        config = RAGConfig(rescore_factor=2)
+
+        report_vector_modes(vectors, config)
+
+        mock_compare.assert_called_once_with(vectors, rescore_factor=2)
+
+
+class TestBuildQueryLexicon:
+    """Тесты для функции build_query_lexicon"""
+
+    def test_build_query_lexicon(self, tmp_path):
+        """Тест сохранения словаря терминов рядом с индексом"""
+        from langchain.schema import Document
+        from src.rag_main.rag_query_normalizer import LEXICON_FILE, QueryLexicon
+
+        docs = [Document(page_content="Работодатель обязан. Работодатель вправе.")]
+        config = RAGConfig(vector_store_path=str(tmp_path))
+
+        build_query_lexicon(docs, config)
+
+        lexicon = QueryLexicon.load(os.path.join(str(tmp_path), LEXICON_FILE))
+        assert lexicon.vocabulary["работодатель"] == 2
+
 
 class TestIntegration:
     """Интеграционные тесты"""